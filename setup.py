@@ -1,3 +1,4 @@
+import os
 import pathlib
 from setuptools import setup
 
@@ -7,6 +8,21 @@ HERE = pathlib.Path(__file__).parent
 # The text of the README file
 README = (HERE / "README.md").read_text()
 
+# Set TORN_OPEN_USE_MYPYC=1 to compile the OpenAPI spec plugin with mypyc.
+# Otherwise the pure Python package is installed.
+ext_modules = []
+if os.environ.get("TORN_OPEN_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(
+        [
+            "--ignore-missing-imports",
+            "--follow-untyped-imports",
+            "--follow-imports=silent",
+            "torn_open/api_spec/plugin.py",
+        ]
+    )
+
 setup(
     name="torn_open",
     version="0.0.3",
@@ -19,6 +35,7 @@ setup(
     license="MIT",
     packages=["torn_open", "torn_open/api_spec"],
     include_package_data=True,
+    ext_modules=ext_modules,
     setup_requires=[
         "wheel",
     ],
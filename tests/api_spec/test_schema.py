@@ -1,5 +1,10 @@
+from enum import Enum
+
+import pytest
+
 from tornado.web import url
 from pydantic import BaseModel
+from apispec.exceptions import DuplicateComponentNameError
 
 from torn_open import Application, AnnotatedHandler, RequestModel, ResponseModel
 
@@ -37,3 +42,47 @@ def test_create_app_with_duplicated_schemas():
             url(r"/3", Schema3Handler),
         ]
     )
+
+
+def test_create_app_with_conflicting_schemas():
+    class FirstHandler(AnnotatedHandler):
+        class ConflictingEnum(Enum):
+            x = "x"
+
+        def get(self, enum_param: ConflictingEnum):
+            pass
+
+    class SecondHandler(AnnotatedHandler):
+        class ConflictingEnum(Enum):
+            y = "y"
+
+        def get(self, enum_param: ConflictingEnum):
+            pass
+
+    with pytest.raises(DuplicateComponentNameError):
+        Application(
+            [
+                url(r"/1", FirstHandler),
+                url(r"/2", SecondHandler),
+            ]
+        )
+
+
+def test_create_app_with_conflicting_schemas_in_one_handler():
+    class FirstEnumNamespace:
+        class ConflictingEnum(Enum):
+            x = "x"
+
+    class SecondEnumNamespace:
+        class ConflictingEnum(Enum):
+            y = "y"
+
+    class ConflictingHandler(AnnotatedHandler):
+        def get(self, enum_param: FirstEnumNamespace.ConflictingEnum):
+            pass
+
+        def post(self, enum_param: SecondEnumNamespace.ConflictingEnum):
+            pass
+
+    with pytest.raises(DuplicateComponentNameError):
+        Application([url(r"/conflicting", ConflictingHandler)])
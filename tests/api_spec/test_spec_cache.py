@@ -0,0 +1,217 @@
+import gc
+import weakref
+from enum import Enum
+from typing import Any, Tuple
+
+from tornado.web import url
+
+from torn_open import Application, AnnotatedHandler, RequestModel, ResponseModel
+from torn_open import types
+from torn_open.api_spec import plugin
+
+
+class MyEnum(Enum):
+    x = "x"
+    y = "y"
+
+
+class MyRequestModel(RequestModel):
+    a: MyEnum
+
+
+class MyResponseModel(ResponseModel):
+    a: MyEnum
+
+
+class CachedHandler(AnnotatedHandler):
+    def get(self, path_param: str, enum_query_param: MyEnum):
+        pass
+
+    def post(self, path_param: str, request_body: MyRequestModel) -> MyResponseModel:
+        pass
+
+
+def create_app():
+    return Application(
+        [
+            url(r"/cached/(?P<path_param>[^/]+)", CachedHandler),
+            url(r"/cached/2/(?P<path_param>[^/]+)", CachedHandler),
+        ]
+    )
+
+
+def test_cached_spec_is_identical_to_first_spec():
+    first_spec = create_app().api_spec.to_dict()
+    second_spec = create_app().api_spec.to_dict()
+
+    assert first_spec == second_spec
+
+
+def test_cached_spec_registers_referenced_schemas():
+    create_app()
+    spec = create_app().api_spec.to_dict()
+
+    schemas = spec["components"]["schemas"]
+    assert "MyEnum" in schemas
+    assert "MyResponseModel" not in schemas
+
+
+def test_cached_spec_is_not_mutated_by_other_specs():
+    first_spec = create_app().api_spec.to_dict()
+    first_spec["paths"]["/cached/{path_param}"]["get"]["parameters"].clear()
+    first_spec["paths"]["/cached/{path_param}"]["parameters"].clear()
+
+    second_spec = create_app().api_spec.to_dict()
+    path = second_spec["paths"]["/cached/{path_param}"]
+    assert len(path["get"]["parameters"]) == 1
+    assert len(path["parameters"]) == 1
+
+
+def test_cached_enum_parameter_schemas():
+    class EnumParamsHandler(AnnotatedHandler):
+        def get(self, enum_param: MyEnum, enum_param_with_default: MyEnum = MyEnum.y):
+            pass
+
+    def create_enum_app():
+        return Application([url(r"/enum_params", EnumParamsHandler)])
+
+    create_enum_app()
+    spec = create_enum_app().api_spec.to_dict()
+
+    enum_schema = {"$ref": "#/components/schemas/MyEnum"}
+    enum_param, enum_param_with_default = spec["paths"]["/enum_params"]["get"][
+        "parameters"
+    ]
+    assert enum_param["schema"] == enum_schema
+    assert enum_param_with_default["schema"]["allOf"] == [enum_schema]
+    assert enum_param_with_default["schema"]["default"] == "y"
+    assert spec["components"]["schemas"]["MyEnum"]["enum"] == ["x", "y"]
+
+
+def test_enum_parameter_defaults_are_cached():
+    class DefaultEnum(Enum):
+        x = "x"
+        y = "y"
+
+    class FirstHandler(AnnotatedHandler):
+        def get(self, enum_param: DefaultEnum = DefaultEnum.y):
+            pass
+
+    class SecondHandler(AnnotatedHandler):
+        def get(self, enum_param: DefaultEnum = DefaultEnum.y):
+            pass
+
+    Application([url(r"/first", FirstHandler)])
+    parameter_schemas = plugin._PARAMETER_SCHEMAS_CACHE[DefaultEnum]
+    cached_parameter_schemas = dict(parameter_schemas)
+    assert list(cached_parameter_schemas) == [("enum_param", Enum, "y")]
+
+    spec = Application([url(r"/second", SecondHandler)]).api_spec.to_dict()
+
+    # The second handler reuses the schema built for the first one
+    assert parameter_schemas.keys() == cached_parameter_schemas.keys()
+    for key, parameter_schema in parameter_schemas.items():
+        assert parameter_schema is cached_parameter_schemas[key]
+    (enum_param,) = spec["paths"]["/second"]["get"]["parameters"]
+    assert enum_param["schema"]["default"] == "y"
+    assert spec["components"]["schemas"]["DefaultEnum"]["enum"] == ["x", "y"]
+
+
+def test_cached_parameter_schemas_keep_equal_defaults_apart():
+    class IntDefaultHandler(AnnotatedHandler):
+        def get(self, tuple_param: Tuple[Any, ...] = (1,), scalar_param: Any = 1):
+            pass
+
+    class BoolDefaultHandler(AnnotatedHandler):
+        def get(self, tuple_param: Tuple[Any, ...] = (True,), scalar_param: Any = True):
+            pass
+
+    spec = Application(
+        [url(r"/int", IntDefaultHandler), url(r"/bool", BoolDefaultHandler)]
+    ).api_spec.to_dict()
+
+    int_params = spec["paths"]["/int"]["get"]["parameters"]
+    bool_params = spec["paths"]["/bool"]["get"]["parameters"]
+    assert [param["schema"]["default"] for param in int_params] == [(1,), 1]
+    assert [param["schema"]["default"] for param in bool_params] == [(True,), True]
+    assert type(bool_params[0]["schema"]["default"][0]) is bool
+    assert type(bool_params[1]["schema"]["default"]) is bool
+
+
+def test_cached_schemas_do_not_keep_classes_alive():
+    def create_dynamic_app():
+        class DynamicEnum(Enum):
+            x = "x"
+
+        class DynamicRequestModel(RequestModel):
+            a: DynamicEnum
+
+        class DynamicResponseModel(ResponseModel):
+            a: DynamicEnum
+
+        class DynamicHandler(AnnotatedHandler):
+            def get(
+                self, enum_param: DynamicEnum = DynamicEnum.x
+            ) -> DynamicResponseModel:
+                pass
+
+            def post(self, request_body: DynamicRequestModel):
+                pass
+
+        Application([url(r"/dynamic", DynamicHandler)]).api_spec.to_yaml()
+        types.cast(DynamicEnum, "x")
+        classes = (
+            DynamicEnum,
+            DynamicRequestModel,
+            DynamicResponseModel,
+            DynamicHandler,
+        )
+        return [weakref.ref(cls) for cls in classes]
+
+    refs = create_dynamic_app()
+    gc.collect()
+
+    assert all(ref() is None for ref in refs)
+
+
+def test_rendered_yaml_is_reused():
+    api_spec = create_app().api_spec
+
+    assert api_spec.warmup().to_yaml() is api_spec.to_yaml()
+
+
+def test_adding_tag_renders_yaml_again():
+    api_spec = create_app().api_spec.warmup()
+
+    api_spec.tag({"name": "added"})
+
+    assert api_spec.to_dict()["tags"] == [{"name": "added"}]
+    assert "added" in api_spec.to_yaml()
+
+
+def test_registering_component_renders_yaml_again():
+    api_spec = create_app().api_spec.warmup()
+
+    api_spec.components.security_scheme(
+        "api_key", {"type": "apiKey", "in": "header", "name": "X-API-Key"}
+    )
+    api_spec.components.schema("Added", {"type": "object"})
+
+    components = api_spec.to_dict()["components"]
+    assert "api_key" in components["securitySchemes"]
+    assert "Added" in components["schemas"]
+    assert "X-API-Key" in api_spec.to_yaml()
+    assert "Added" in api_spec.to_yaml()
+
+
+def test_changing_options_renders_yaml_again():
+    api_spec = create_app().api_spec.warmup()
+
+    api_spec.options["servers"] = [{"url": "https://example.com"}]
+
+    assert "servers" in api_spec.to_dict()
+    assert "https://example.com" in api_spec.to_yaml()
+
+    api_spec.options["servers"][0]["url"] = "https://example.org"
+
+    assert "https://example.org" in api_spec.to_yaml()
@@ -35,16 +35,18 @@ class _HandlerClassParams:
             if method is getattr(tornado.web.RequestHandler, http_method):
                 continue
 
-            self._set_path_param_names(method, rule)
-            self._set_query_param_names(method)
-            self._set_json_param_names(method)
-            self._set_response_models(method)
-
-    def _set_path_param_names(self, method, rule: Union[Pattern, str]):
+            signature = inspect.signature(method)
+            self._set_path_param_names(method, signature, rule)
+            self._set_query_param_names(method, signature)
+            self._set_json_param_names(method, signature)
+            self._set_response_models(method, signature)
+
+    def _set_path_param_names(
+        self, method, signature: inspect.Signature, rule: Union[Pattern, str]
+    ):
         if isinstance(rule, str):
             return
         path_params = [param for param in rule.groupindex.keys()]
-        signature = inspect.signature(method)
         for param_name, parameter in signature.parameters.items():
             if param_name not in path_params:
                 continue
@@ -56,9 +58,8 @@ class _HandlerClassParams:
         )
         assert len(path_params) == len(self.path_params), msg
 
-    def _set_query_param_names(self, method):
+    def _set_query_param_names(self, method, signature: inspect.Signature):
         self.query_params[method.__name__] = {}
-        signature = inspect.signature(method)
         for param_name, parameter in signature.parameters.items():
             if not self._is_query_param(param_name, parameter):
                 continue
@@ -80,10 +81,9 @@ class _HandlerClassParams:
             return not issubclass(parameter.annotation, models.RequestModel)
         return True
 
-    def _set_json_param_names(self, method):
+    def _set_json_param_names(self, method, signature: inspect.Signature):
         self.json_param[method.__name__] = {}
         json_params = []
-        signature = inspect.signature(method)
         for param_name, parameter in signature.parameters.items():
             if not self._is_json_param(param_name, parameter, method):
                 continue
@@ -112,8 +112,7 @@ class _HandlerClassParams:
             return issubclass(parameter.annotation, models.RequestModel)
         return False
 
-    def _set_response_models(self, method):
-        signature = inspect.signature(method)
+    def _set_response_models(self, method, signature: inspect.Signature):
         response_model = (
             signature.return_annotation
             if signature.return_annotation != inspect._empty
@@ -189,7 +188,7 @@ class _HandlerParamsParser:
 
         if parameter.default != inspect._empty:
             return parameter.default
-        elif types.is_optional(parameter_type):
+        elif types.classify(parameter_type)[1] & types.IS_OPTIONAL:
             return None
         raise models.ClientError(
             status_code=400,
@@ -219,9 +218,21 @@ class AnnotatedHandler(tornado.web.RequestHandler):
     string to the inherited handler overwrite this doc string.
     """
 
+    handler_class_params: _HandlerClassParams
+
     @classmethod
     def _set_params(cls, rule: Pattern):
-        cls.handler_class_params = _HandlerClassParams(cls, rule)
+        # Params only depend on the handler class and the rule, so they are
+        # reused whenever the same handler and rule are seen again.
+        # Looked up in the class __dict__ so subclasses keep their own params.
+        handler_class_params_by_rule = cls.__dict__.get("_handler_class_params_by_rule")
+        if handler_class_params_by_rule is None:
+            handler_class_params_by_rule = {}
+            cls._handler_class_params_by_rule = handler_class_params_by_rule
+
+        if rule not in handler_class_params_by_rule:
+            handler_class_params_by_rule[rule] = _HandlerClassParams(cls, rule)
+        cls.handler_class_params = handler_class_params_by_rule[rule]
 
     @tornado.gen.coroutine
     def _execute(self, transforms, *args, **kwargs):
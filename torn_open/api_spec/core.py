@@ -1,16 +1,56 @@
+from copy import deepcopy
+
 from apispec.core import APISpec, Components
 
 
 class TornOpenComponents(Components):
+    def __init__(self, plugins, openapi_version):
+        super().__init__(plugins, openapi_version)
+        # Component objects as passed in, before apispec copies them
+        self._registered_schemas = {}
+
     def schema(self, component_id, component, **kwargs):
+        if self._registered_schemas.get(component_id) is component:
+            return self
         if self.schemas.get(component_id) == component:
             return self
 
         super().schema(component_id, component, **kwargs)
+        self._registered_schemas[component_id] = component
+        return self
+
 
 class TornOpenAPISpec(APISpec):
     def __init__(self, title, version, openapi_version, plugins=(), **options):
         super().__init__(title, version, openapi_version, plugins, **options)
 
+        # self._paths is kept as the OrderedDict set by APISpec: apispec's yaml
+        # dumper only preserves key order for OrderedDicts and sorts plain dicts,
+        # which would reorder the paths in openapi.yaml
+
         # Override default Components used
         self.components = TornOpenComponents(self.plugins, self.openapi_version)
+
+        # openapi.yaml as last rendered, and a copy of the spec it was rendered from
+        self._rendered_yaml = None
+        self._rendered_spec = None
+
+    def warmup(self):
+        """
+        Renders openapi.yaml now rather than on the first request for it.
+        Opt-in, e.g. by calling `app.api_spec.warmup()` after creating the Application.
+        """
+        self.to_yaml()
+        return self
+
+    def to_yaml(self, yaml_dump_kwargs=None):
+        if yaml_dump_kwargs is not None:
+            return super().to_yaml(yaml_dump_kwargs)
+
+        # Changes to paths, tags, components and options all show up in the spec
+        # dict, which is much cheaper to build and compare than to render
+        spec = self.to_dict()
+        if self._rendered_yaml is None or spec != self._rendered_spec:
+            self._rendered_yaml = super().to_yaml()
+            self._rendered_spec = deepcopy(spec)
+        return self._rendered_yaml
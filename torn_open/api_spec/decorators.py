@@ -1,6 +1,3 @@
-from functools import wraps
-
-
 # Decorators
 def tags(*tag_list):
     """
@@ -38,12 +35,7 @@ def tags(*tag_list):
     """
     def decorator(func):
         func._openapi_tags = [*tag_list]
-
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
-
-        return wrapper
+        return func
 
     return decorator
 
@@ -84,11 +76,6 @@ def summary(summary_text):
     """
     def decorator(func):
         func._openapi_summary = summary_text
-
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
-
-        return wrapper
+        return func
 
     return decorator
@@ -1,64 +1,142 @@
-from typing import Dict, Tuple, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from copy import deepcopy
+from enum import Enum
+from types import MappingProxyType
+from weakref import WeakKeyDictionary
 import inspect
 
-from pydantic import create_model
+from pydantic import BaseModel, create_model
+from tornado.web import URLSpec
 
-from apispec import BasePlugin
-from torn_open.types import is_optional, GenericAliases
+from apispec.exceptions import DuplicateComponentNameError
+from apispec.plugin import BasePlugin
+from torn_open.annotated_handler import AnnotatedHandler
+from torn_open.types import is_optional, classify, GenericAliases, IS_ENUM
 from torn_open.models import ClientError, ServerError
 from torn_open.api_spec.exception_finder import get_exceptions
 from torn_open.api_spec.core import TornOpenComponents
 
-# utils
-def _is_implemented(method, handler):
-    if isinstance(method, str):
-        method_name = method
-        method = getattr(handler, method)
-    else:
-        method_name = method.__name__
-    return method is not getattr(handler.__bases__[0], method_name)
 
-
-def _clear_none_from_dict(dictionary):
+# utils
+def _clear_none_from_dict(dictionary: dict) -> dict:
     return {k: v for k, v in dictionary.items() if v is not None}
 
 
 SCHEMA_REF_TEMPLATE = "#/components/schemas/{model}"
+_TUPLE_ORIGINS = (Tuple, tuple)
+
+
+# Cache
+# Handler classes are defined once, so the spec fragments built for them can be
+# reused across spec builds. Fragments are cached per handler class and url
+# pattern, together with the component schemas registered while building them.
+_HandlerFragments = Dict[str, Tuple[Any, "_ReferencedSchemas"]]
+_OPERATIONS_CACHE: "WeakKeyDictionary[type, _HandlerFragments]" = WeakKeyDictionary()
+_PATH_PARAMS_CACHE: "WeakKeyDictionary[type, _HandlerFragments]" = WeakKeyDictionary()
+
+
+class _ReferencedSchemas(dict):
+    """Collects the component schemas registered while building a spec fragment"""
+
+    def schema(self, component_id: str, component: dict, **_) -> "_ReferencedSchemas":
+        if component_id in self and self[component_id] != component:
+            raise DuplicateComponentNameError(
+                f'Another schema with name "{component_id}" is already registered.'
+            )
+        self[component_id] = component
+        return self
+
+
+# Spec fragments are either built against the spec's components or collected
+_Components = Union[TornOpenComponents, _ReferencedSchemas]
+
+
+def _get_cached_fragment(
+    cache: "WeakKeyDictionary[type, _HandlerFragments]",
+    url_spec: URLSpec,
+    components: TornOpenComponents,
+    build: Callable[[URLSpec, _ReferencedSchemas], Any],
+) -> Any:
+    handler_cache = cache.setdefault(url_spec.handler_class, {})
+    pattern = url_spec.regex.pattern
+    if pattern not in handler_cache:
+        referenced_schemas = _ReferencedSchemas()
+        handler_cache[pattern] = build(url_spec, referenced_schemas), referenced_schemas
+
+    fragment, referenced_schemas = handler_cache[pattern]
+    for referenced_schema_id, referenced_schema in referenced_schemas.items():
+        components.schema(referenced_schema_id, referenced_schema)
+
+    # apispec mutates the fragments it receives, so hand out copies
+    return deepcopy(fragment)
 
 
 class TornOpenPlugin(BasePlugin):
     """APISpec plugin for Tornado"""
 
-    def init_spec(self, spec):
+    def init_spec(self, spec) -> None:
         self.spec = spec
 
-    def path_helper(self, *, url_spec, parameters, **_):
+    # Only the keyword arguments used by TornOpen are declared
+    def path_helper(  # type: ignore[override]
+        self, *, url_spec: URLSpec, parameters: List[dict], **_
+    ) -> str:
         path = get_path(url_spec)
-        parameters.extend(get_path_params(url_spec.handler_class, self.spec.components))
+        parameters.extend(
+            _get_cached_fragment(
+                _PATH_PARAMS_CACHE,
+                url_spec,
+                self.spec.components,
+                get_url_spec_path_params,
+            )
+        )
         return path
 
-    def operation_helper(self, *, operations, url_spec, **_):
-        operations.update(**Operations(url_spec, self.spec.components))
+    def operation_helper(  # type: ignore[override]
+        self, *, operations: dict, url_spec: URLSpec, **_
+    ) -> None:
+        operations.update(
+            **_get_cached_fragment(
+                _OPERATIONS_CACHE,
+                url_spec,
+                self.spec.components,
+                Operations,
+            )
+        )
 
 
 # Path helper methods
-def get_path(url_spec):
-    path = replace_path_with_openapi_placeholders(url_spec)
-    path = right_strip_path(path)
+# The OpenAPI path only depends on the url pattern
+_PATHS_CACHE: Dict[str, str] = {}
+
+
+def get_path(url_spec: URLSpec) -> str:
+    pattern = url_spec.regex.pattern
+    path = _PATHS_CACHE.get(pattern)
+    if path is None:
+        path = replace_path_with_openapi_placeholders(url_spec)
+        path = right_strip_path(path)
+        _PATHS_CACHE[pattern] = path
     return path
 
 
-def extract_and_sort_path_path_params(url_spec):
-    path_params = url_spec.regex.groupindex
-    path_params = {
-        k: v for k, v in sorted(path_params.items(), key=lambda item: item[1])
-    }
-    path_params = tuple(f"{{{param}}}" for param in path_params)
-    return path_params
+def extract_and_sort_path_path_params(url_spec: URLSpec) -> Tuple[str, ...]:
+    path_params = sorted(url_spec.regex.groupindex.items(), key=lambda item: item[1])
+    return tuple(f"{{{param}}}" for param, _ in path_params)
 
 
-def replace_path_with_openapi_placeholders(url_spec):
-    path = url_spec.matcher._path
+def replace_path_with_openapi_placeholders(url_spec: URLSpec) -> str:
+    path = url_spec.matcher._path  # type: ignore[attr-defined]
     if url_spec.regex.groups == 0:
         return path
 
@@ -66,12 +144,18 @@ def replace_path_with_openapi_placeholders(url_spec):
     return path % path_params
 
 
-def right_strip_path(path):
+def right_strip_path(path: str) -> str:
     return path.rstrip("/*")
 
 
 # Path params
-def get_path_params(handler, components: TornOpenComponents):
+def get_url_spec_path_params(url_spec: URLSpec, components: _Components) -> List[dict]:
+    return get_path_params(url_spec.handler_class, components)
+
+
+def get_path_params(
+    handler: Type[AnnotatedHandler], components: _Components
+) -> List[dict]:
     path_params = handler.handler_class_params.path_params
     parameters = [
         PathParameter(parameter, components) for parameter in path_params.values()
@@ -79,126 +163,202 @@ def get_path_params(handler, components: TornOpenComponents):
     return parameters
 
 
-def is_inspect_empty(obj):
+def is_inspect_empty(obj: Any) -> bool:
     return obj is inspect._empty
 
 
-def Schema(parameter: inspect.Parameter, components: TornOpenComponents):
+def Schema(parameter: inspect.Parameter, components: _Components) -> dict:
 
     annotation = (
         parameter.annotation if not is_inspect_empty(parameter.annotation) else str
     )
     default = parameter.default if not is_inspect_empty(parameter.default) else ...
-    fields = {parameter.name: (annotation, default)}
+
+    default_key = _get_default_key(annotation, default)
+    if default_key is not None:
+        schema, referenced_schemas = _get_cached_parameter_schema(
+            parameter.name, annotation, default, default_key
+        )
+    else:
+        schema, referenced_schemas = _get_parameter_schema(
+            parameter.name, annotation, default
+        )
+
+    for referenced_schema_id, referenced_schema in referenced_schemas.items():
+        components.schema(referenced_schema_id, referenced_schema)
+
+    return deepcopy(schema)
+
+
+def _get_parameter_schema(
+    name: str, annotation: Any, default: Any
+) -> Tuple[dict, dict]:
+    fields: Dict[str, Any] = {name: (annotation, default)}
 
     model = create_model("_", **fields).schema(ref_template=SCHEMA_REF_TEMPLATE)
-    schema = model.get("properties", {}).get(parameter.name, {})
-    if schema.get("type") == "integer":
-        if schema.get("exclusiveMinimum") is not None:
-            schema["minimum"] = schema["exclusiveMinimum"]
+    schema = model.get("properties", {}).get(name, {})
+    schema_type = schema.get("type")
+    if schema_type == "integer":
+        exclusive_minimum = schema.get("exclusiveMinimum")
+        if exclusive_minimum is not None:
+            schema["minimum"] = exclusive_minimum
             schema["exclusiveMinimum"] = True
-    elif schema.get("type") == "array":
-        if isinstance(annotation, GenericAliases) and annotation.__origin__ in (
-            Tuple,
-            tuple,
+    elif schema_type == "array":
+        if (
+            isinstance(annotation, GenericAliases)
+            and annotation.__origin__ in _TUPLE_ORIGINS
         ):
-            if len(schema["items"]) > 1:
-                schema["items"] = {"oneOf": schema["items"]}
+            items = schema["items"]
+            if len(items) > 1:
+                schema["items"] = {"oneOf": items}
 
     schema = _clear_none_from_dict(schema)
 
     referenced_schemas = model.pop("definitions", {})
-    if not referenced_schemas:
-        return schema
-
-    for referenced_schema_id, referenced_schema in referenced_schemas.items():
-        components.schema(referenced_schema_id, referenced_schema)
-
-    return schema
+    return schema, referenced_schemas
+
+
+# Parameter schemas are cached by default value, so only defaults whose type and
+# equality imply an identical schema are cached. Containers can hold equal values
+# of different types, e.g. (1,) and (True,), and floats equal -0.0 and 0.0.
+_CACHEABLE_DEFAULT_TYPES = (type(None), type(...), bool, int, str)
+
+
+def _get_default_key(annotation: Any, default: Any) -> Optional[Tuple[type, Any]]:
+    default_type = type(default)
+    if default_type in _CACHEABLE_DEFAULT_TYPES:
+        return default_type, default
+
+    # Enum members would keep their enum alive, so they are keyed by name. Only
+    # members of the annotated enum are cached, as then the annotation, which is
+    # the outer key, determines the enum.
+    if isinstance(default, Enum):
+        enum, flags = classify(annotation)
+        if flags & IS_ENUM and default_type is enum:
+            return Enum, default.name
+    return None
+
+
+# Like the fragment caches, parameter schemas are weakly keyed by annotation so
+# that dynamically defined types can be garbage collected
+_ParameterSchemas = Dict[Tuple[str, type, Any], Tuple[dict, dict]]
+_PARAMETER_SCHEMAS_CACHE: "WeakKeyDictionary[Any, _ParameterSchemas]" = (
+    WeakKeyDictionary()
+)
+
+
+def _get_cached_parameter_schema(
+    name: str, annotation: Any, default: Any, default_key: Tuple[type, Any]
+) -> Tuple[dict, dict]:
+    try:
+        parameter_schemas = _PARAMETER_SCHEMAS_CACHE.get(annotation)
+    except TypeError:
+        # Unhashable or not weakly referenceable annotations cannot be cached
+        return _get_parameter_schema(name, annotation, default)
+    if parameter_schemas is None:
+        parameter_schemas = _PARAMETER_SCHEMAS_CACHE[annotation] = {}
+
+    key = (name, *default_key)
+    parameter_schema = parameter_schemas.get(key)
+    if parameter_schema is None:
+        parameter_schema = _get_parameter_schema(name, annotation, default)
+        parameter_schemas[key] = parameter_schema
+    return parameter_schema
+
+
+def PathParameter(parameter: inspect.Parameter, components: _Components) -> dict:
+    return Parameter(parameter, "path", components, required=True)
 
 
-def PathParameter(parameter: inspect.Parameter, components: TornOpenComponents):
-    return Parameter(parameter, "path", components, required=True)
+def QueryParameter(parameter: inspect.Parameter, components: _Components) -> dict:
+    required = not is_optional(parameter.annotation)
+    return Parameter(parameter, "query", components, required=required)
 
 
 def Parameter(
     parameter: inspect.Parameter,
-    param_type,
-    components: TornOpenComponents,
-    required: bool = None,
-):
+    param_type: str,
+    components: _Components,
+    required: bool,
+) -> dict:
     return {
         "name": parameter.name,
         "in": param_type,
-        "required": required
-        if required is not None
-        else not is_optional(parameter.annotation),
+        "required": required,
         "schema": Schema(parameter, components),
     }
 
 
 # Operations helper methods
-def Operations(url_spec, components: TornOpenComponents):
-    def _get_implemented_http_methods(handler):
-        return [
-            method.lower()
-            for method in handler.SUPPORTED_METHODS
-            if _is_implemented(method.lower(), handler)
-        ]
-
+def Operations(url_spec: URLSpec, components: _Components) -> Dict[str, dict]:
     handler = url_spec.handler_class
-    implemented_methods = _get_implemented_http_methods(handler)
-    operations = {
-        method: Operation(method, handler, components).schema()
-        for method in implemented_methods
-    }
+    base_handler = handler.__bases__[0]
+    operations: Dict[str, dict] = {}
+    for http_method in handler.SUPPORTED_METHODS:
+        method_name = http_method.lower()
+        method = getattr(handler, method_name)
+        # Skip http methods not implemented by the handler itself
+        if method is getattr(base_handler, method_name):
+            continue
+        operations[method_name] = Operation(
+            method_name, method, handler, components
+        ).schema()
     return operations
 
 
 class Operation:
-    def _get_tags(self):
-        if not _is_implemented(self.method, self.handler):
-            return None
+    def _get_tags(self) -> Optional[List[str]]:
         return getattr(self.method, "_openapi_tags", None)
 
-    def _get_summary(self):
-        if not _is_implemented(self.method, self.handler):
-            return None
+    def _get_summary(self) -> Optional[str]:
         return getattr(self.method, "_openapi_summary", None)
 
-    def _get_query_params(self):
+    def _get_query_params(self) -> List[dict]:
         parameters = self.handler.handler_class_params.query_params[
-            self.method.__name__
+            self.method_name
         ].values()
-        return [
-            Parameter(parameter, "query", self.components) for parameter in parameters
-        ]
+        return [QueryParameter(parameter, self.components) for parameter in parameters]
 
-    def _get_operation_description(self):
+    def _get_operation_description(self) -> Optional[str]:
         description = self.method.__doc__
         description = description.strip() if description else description
         return description
 
-    def __init__(self, method, handler, components):
-        self.method = getattr(handler, method, None)
+    def __init__(
+        self,
+        method_name: str,
+        method: Callable,
+        handler: Type[AnnotatedHandler],
+        components: _Components,
+    ):
+        self.method_name = method_name
+        self.method = method
         self.handler = handler
         self.components = components
 
-        operation = {
-            "tags": self._get_tags(),
-            "summary": self._get_summary(),
-            "description": self._get_operation_description(),
-            "parameters": self._get_query_params(),
-            "requestBody": RequestBody(method, handler),
-            "responses": Responses(method, handler, components),
-        }
-        self._schema = _clear_none_from_dict(operation)
-
-    def schema(self):
+        # Only tags, summary, description and requestBody can be None
+        operation: Dict[str, Any] = {}
+        tags = self._get_tags()
+        if tags is not None:
+            operation["tags"] = tags
+        summary = self._get_summary()
+        if summary is not None:
+            operation["summary"] = summary
+        description = self._get_operation_description()
+        if description is not None:
+            operation["description"] = description
+        operation["parameters"] = self._get_query_params()
+        request_body = RequestBody(method_name, handler)
+        if request_body is not None:
+            operation["requestBody"] = request_body
+        operation["responses"] = Responses(method_name, method, handler, components)
+        self._schema = operation
+
+    def schema(self) -> dict:
         return self._schema
 
 
-def RequestBody(method: str, handler):
+def RequestBody(method: str, handler: Type[AnnotatedHandler]) -> Optional[dict]:
     json_param = handler.handler_class_params.json_param[method]
     if not json_param:
         return None
@@ -206,20 +366,35 @@ def RequestBody(method: str, handler):
     return {"content": {"application/json": {"schema": RequestBodySchema(parameter)}}}
 
 
-def RequestBodySchema(parameter):
-    return parameter.annotation.schema(ref_template=SCHEMA_REF_TEMPLATE)
+def RequestBodySchema(parameter: inspect.Parameter) -> dict:
+    return deepcopy(_get_cached_model_schema(parameter.annotation))
+
+
+# Weakly keyed by model, like the fragment caches
+_MODEL_SCHEMAS_CACHE: "WeakKeyDictionary[type, dict]" = WeakKeyDictionary()
+
+
+def _get_cached_model_schema(model: Type[BaseModel]) -> dict:
+    schema = _MODEL_SCHEMAS_CACHE.get(model)
+    if schema is None:
+        schema = model.schema(ref_template=SCHEMA_REF_TEMPLATE)
+        _MODEL_SCHEMAS_CACHE[model] = schema
+    return schema
 
 
-def Responses(method, handler, components):
+def Responses(
+    method_name: str,
+    method: Callable,
+    handler: Type[AnnotatedHandler],
+    components: _Components,
+) -> Dict[int, dict]:
     return {
-        200: SuccessResponse(method, handler, components),
-        **_get_failure_responses(method, handler),
+        200: SuccessResponse(method_name, handler, components),
+        **_get_failure_responses(method),
     }
 
 
-def SuccessResponse(method, handler, components):
-    def get_success_response_description(response_model):
-        TEMPLATE_RESPONSE_DESCRIPTION = '''
+_DEFAULT_SUCCESS_RESPONSE_DESCRIPTION = '''
         Include a `torn_open.models.ResponseModel` annotation with documentation to overwrite this default description.
 
         Example
@@ -239,15 +414,23 @@ def SuccessResponse(method, handler, components):
                 pass
 
         ```
-        '''
-        description = TEMPLATE_RESPONSE_DESCRIPTION.strip()
-        if response_model and response_model.__doc__:
-            description = response_model.__doc__.strip()
-        return description
+        '''.strip()
+
+
+def _get_success_response_description(
+    response_model: Optional[Type[BaseModel]],
+) -> str:
+    if response_model and response_model.__doc__:
+        return response_model.__doc__.strip()
+    return _DEFAULT_SUCCESS_RESPONSE_DESCRIPTION
 
+
+def SuccessResponse(
+    method: str, handler: Type[AnnotatedHandler], components: _Components
+) -> dict:
     response_model = handler.handler_class_params.response_models[method]
     return {
-        "description": get_success_response_description(response_model),
+        "description": _get_success_response_description(response_model),
         "content": {
             "application/json": {
                 "schema": SuccessResponseModelSchema(response_model, components)
@@ -256,32 +439,49 @@ def SuccessResponse(method, handler, components):
     }
 
 
-def SuccessResponseModelSchema(response_model, components):
-    schema = (
-        response_model.schema(ref_template=SCHEMA_REF_TEMPLATE)
-        if response_model
-        else None
-    )
-    if not schema:
-        return schema
-
-    referenced_schemas = schema.pop("definitions", {})
-    if not referenced_schemas:
-        return schema
+def SuccessResponseModelSchema(
+    response_model: Optional[Type[BaseModel]], components: _Components
+) -> Optional[dict]:
+    if not response_model:
+        return None
 
+    schema, referenced_schemas = _get_cached_model_schema_and_definitions(
+        response_model
+    )
     for referenced_schema_id, referenced_schema in referenced_schemas.items():
         components.schema(referenced_schema_id, referenced_schema)
-    return schema
+
+    # Nested schemas are shared with the cache. Operations are only built for
+    # the fragment cache, which hands out deep copies.
+    return dict(schema)
+
+
+_SplitSchema = Tuple[Mapping[str, Any], Mapping[str, dict]]
+_SPLIT_SCHEMAS_CACHE: "WeakKeyDictionary[type, _SplitSchema]" = WeakKeyDictionary()
+
+
+def _get_cached_model_schema_and_definitions(
+    model: Type[BaseModel],
+) -> _SplitSchema:
+    schema_and_definitions = _SPLIT_SCHEMAS_CACHE.get(model)
+    if schema_and_definitions is None:
+        schema = deepcopy(_get_cached_model_schema(model))
+        referenced_schemas = schema.pop("definitions", {})
+        schema_and_definitions = (
+            MappingProxyType(schema),
+            MappingProxyType(referenced_schemas),
+        )
+        _SPLIT_SCHEMAS_CACHE[model] = schema_and_definitions
+    return schema_and_definitions
 
 
-def _get_failure_responses(method, handler) -> Dict[str, dict]:
-    http_method = getattr(handler, method, None)
+def _get_failure_responses(http_method: Callable) -> Dict[int, dict]:
     exceptions = _retrieve_exceptions(http_method)
     return FailedResponses(exceptions)
 
 
-def _retrieve_exceptions(http_method):
-    error_codes_and_types = {}
+def _retrieve_exceptions(http_method: Optional[Callable]) -> Dict[int, List[str]]:
+    error_codes_and_types: Dict[int, List[str]] = {}
     for exception_class, _, kwargs in get_exceptions(http_method):
         if exception_class not in (ClientError, ServerError):
             continue
@@ -292,14 +492,14 @@ def _retrieve_exceptions(http_method):
     return error_codes_and_types
 
 
-def FailedResponses(exceptions):
+def FailedResponses(exceptions: Dict[int, List[str]]) -> Dict[int, dict]:
     failed_responses = {}
     for status_code, error_types in exceptions.items():
         failed_responses[status_code] = FailedResponse(error_types)
     return failed_responses
 
 
-def FailedResponse(error_types):
+def FailedResponse(error_types: List[str]) -> dict:
     return {
         "description": "|".join(error_types),
         "content": {
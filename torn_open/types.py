@@ -2,12 +2,14 @@ from sys import version_info
 import functools
 from typing import (
     Any,
+    Dict,
     List,
     Union,
     Tuple,
     Optional,
 )
 from enum import EnumMeta
+import weakref
 
 python_minor_version = version_info[1]
 if python_minor_version < 7:
@@ -67,20 +69,78 @@ def is_primitive(parameter_type: type):
     return parameter_type in AllPrimitives
 
 
-def cast(parameter_type: Union[type, OptionalType, OptionalList], val: Any):
+# Flags set by classify
+IS_OPTIONAL = 1
+IS_LIST = 2
+IS_TUPLE = 4
+IS_ENUM = 8
+IS_PRIMITIVE = 16
+
+
+def _classify(parameter_type) -> Tuple[Any, int]:
+    flags = IS_OPTIONAL if is_optional(parameter_type) else 0
     parameter_type = retrieve_type(parameter_type)
 
     if is_list(parameter_type):
+        flags |= IS_LIST
+    elif is_tuple(parameter_type):
+        flags |= IS_TUPLE
+    elif isinstance(parameter_type, EnumMeta):
+        flags |= IS_ENUM
+    elif is_primitive(parameter_type):
+        flags |= IS_PRIMITIVE
+    return parameter_type, flags
+
+
+# Flags by id of the parameter type, together with a weak reference to it so
+# that dynamically defined types can be garbage collected. Unlike a
+# WeakKeyDictionary, lookups do not compare typing aliases for equality, which is
+# slow enough to matter on every request. Only the flags are stored, as a cached
+# unwrapped type could be the parameter type itself and would keep it alive.
+_CLASSIFY_CACHE: Dict[int, Tuple["weakref.ReferenceType[Any]", int]] = {}
+
+
+def _discard_classification(parameter_type_id: int, _):
+    _CLASSIFY_CACHE.pop(parameter_type_id, None)
+
+
+# Returns the parameter type with Optional unwrapped and its IS_* flags
+def classify(parameter_type) -> Tuple[Any, int]:
+    parameter_type_id = id(parameter_type)
+    cached = _CLASSIFY_CACHE.get(parameter_type_id)
+    if cached is not None and cached[0]() is parameter_type:
+        flags = cached[1]
+        if flags & IS_OPTIONAL:
+            parameter_type = retrieve_type(parameter_type)
+        return parameter_type, flags
+
+    unwrapped_type, flags = _classify(parameter_type)
+    try:
+        parameter_type_ref = weakref.ref(
+            parameter_type,
+            functools.partial(_discard_classification, parameter_type_id),
+        )
+    except TypeError:
+        # Parameter types that are not weakly referenceable cannot be cached
+        return unwrapped_type, flags
+    _CLASSIFY_CACHE[parameter_type_id] = parameter_type_ref, flags
+    return unwrapped_type, flags
+
+
+def cast(parameter_type: Union[type, OptionalType, OptionalList], val: Any):
+    parameter_type, flags = classify(parameter_type)
+
+    if flags & IS_LIST:
         return cast_list(parameter_type, val)
 
-    if is_tuple(parameter_type):
+    if flags & IS_TUPLE:
         return cast_tuple(parameter_type, val)
 
-    if isinstance(parameter_type, EnumMeta):
+    if flags & IS_ENUM:
         return cast_enum(parameter_type, val)
 
     # Handle primitive params
-    if is_primitive(parameter_type):
+    if flags & IS_PRIMITIVE:
         return cast_primitive(parameter_type, val)
     return val
 
@@ -120,15 +180,17 @@ def cast_list(parameter_type: Union[type, OptionalType, OptionalList], val: str)
         inner_type = str
     else:
         inner_type = parameter_type.__args__[0]
-    if isinstance(inner_type, EnumMeta):
+    # Optional inner types are not unwrapped, so their items are left as is
+    _, flags = classify(inner_type)
+    if flags == IS_ENUM:
         return cast_enum_list(inner_type, val_list)
-    return cast_list_items(inner_type, val_list)
+    if flags == IS_PRIMITIVE:
+        return cast_list_items(inner_type, val_list)
+    return val_list
 
 
 def cast_list_items(parameter_type: type, val: List):
-    if not is_primitive(parameter_type):
-        return val
-    return [cast(parameter_type, item) for item in val]
+    return [cast_primitive(parameter_type, item) for item in val]
 
 
 def cast_enum_list(enum: EnumMeta, val: List[Any]):